@@ -1,4 +1,7 @@
+import functools
 import json
+import logging
+import re
 from typing import Dict, List, Optional, Any
 from astrbot.api.event import filter, AstrMessageEvent, MessageEventResult
 from astrbot.api.star import Context, Star, register
@@ -7,16 +10,97 @@ from astrbot.core.star.filter.command import CommandFilter
 from astrbot.core.star.filter.command_group import CommandGroupFilter
 from astrbot.core.star.filter.permission import PermissionTypeFilter
 from astrbot.core.star.star_handler import star_handlers_registry, StarHandlerMetadata
-from astrbot.core.message.components import At, Plain, Image, Reply, Node, Nodes
+from astrbot.core.message.components import At, Plain, Image, Face, Reply, Node, Nodes
+
+
+_json_dumps = functools.partial(json.dumps, ensure_ascii=False)
+
+# 固定内容的响应在加载时序列化一次，直接返回
+_MSG_DISABLED = "LLM指令执行器已禁用"
+_ERR_MISSING_COMMAND = _json_dumps({"success": False, "error": "缺少必需参数: command"})
+_ERR_DISABLED = _json_dumps({"success": False, "error": _MSG_DISABLED})
+_EMPTY_COMMAND_LIST = _json_dumps({"success": True, "total_count": 0, "plugins": {}}, indent=2)
+
+
+def _error_response(error: str) -> str:
+    """构建 {"success": false, "error": ...} 响应，只需转义错误信息本身"""
+    return '{"success": false, "error": ' + _json_dumps(error) + '}'
+
+
+# 合并转发只对 QQ (aiocqhttp) 平台启用
+_AIOCQHTTP = "aiocqhttp"
+
+# 多条结果合并为一条消息发送只对这些平台启用
+_MERGE_SEND_PLATFORMS = frozenset({_AIOCQHTTP})
+
+# 可以出现在一条消息任意位置的组件；Reply 等只能出现在消息开头或单独发送的组件不参与合并
+_MERGEABLE_COMPONENTS = frozenset({Plain, At, Image, Face})
+
+# 影响发送方式的结果属性，合并发送要求各结果一致，合并后原样保留
+_RESULT_SEND_ATTRS = ("use_t2i_", "type", "result_type", "result_content_type", "async_stream")
+
+# 构建缓存时跳过的插件（核心插件和自身）
+_SKIP_PLUGINS = frozenset({
+    "astrbot",
+    "astrbot_plugin_llm_executor",
+    "astrbot_plugin_command_query",
+    "astrbot-reminder"
+})
+
+# 匹配 args 中独立的 @N 占位符（如 "@0 100" 中的 @0）
+_AT_PLACEHOLDER_RE = re.compile(r"(?:^|\s)@(\d+)(?=\s|$)")
+
+
+# 引用图片的构造方式在模块加载时确定一次；旧版本没有 Image.fromURL 时直接用 file 参数传递 URL
+if hasattr(Image, "fromURL"):
+    _make_image = Image.fromURL
+else:
+    def _make_image(url: str) -> Image:
+        return Image(file=url)
+
+
+def _strip_slash(name: str) -> str:
+    """去掉指令名开头的 / 前缀"""
+    return name[1:] if name.startswith("/") else name
+
+
+class HandlerInfo:
+    """
+    指令处理器信息，使用 __slots__ 减少缓存中每条记录的内存占用
+    """
+    __slots__ = ("command", "description", "plugin", "aliases",
+                 "is_admin", "handler", "module_path")
+    
+    def __init__(self, command: str, description: str, plugin: str,
+                 aliases: List[str], is_admin: bool,
+                 handler: StarHandlerMetadata, module_path: str):
+        self.command = command
+        self.description = description
+        self.plugin = plugin
+        self.aliases = aliases
+        self.is_admin = is_admin
+        self.handler = handler
+        self.module_path = module_path
 
 
 class BotIdentityEventWrapper:
     """
     事件包装器，用于覆盖 get_sender_id() 方法返回Bot的ID
+    
+    常用方法在构造时预先绑定到 slot 上，访问时不再经过 __getattr__ 转发。
+    message_str / message_obj 等数据属性会在执行期间被修改，仍然动态委托。
     """
+    _PREBOUND_METHODS = ("send", "get_platform_name", "get_self_id", "plain_result")
+    
+    __slots__ = ("_original_event", "_bot_user_id") + _PREBOUND_METHODS
+    
     def __init__(self, original_event: AstrMessageEvent, bot_user_id: str):
-        self._original_event = original_event
-        self._bot_user_id = bot_user_id
+        object.__setattr__(self, "_original_event", original_event)
+        object.__setattr__(self, "_bot_user_id", bot_user_id)
+        for name in self._PREBOUND_METHODS:
+            method = getattr(original_event, name, None)
+            if method is not None:
+                object.__setattr__(self, name, method)
     
     def get_sender_id(self):
         """返回Bot的ID而不是原始发送者ID"""
@@ -32,6 +116,9 @@ class BotIdentityEventWrapper:
             object.__setattr__(self, name, value)
         else:
             setattr(self._original_event, name, value)
+            # 预绑定的方法被替换时同步更新 slot
+            if name in self._PREBOUND_METHODS:
+                object.__setattr__(self, name, value)
 
 
 @register(
@@ -64,8 +151,12 @@ class LLMExecutorPlugin(Star):
         """插件初始化"""
         super().__init__(context)
         self.config = config or {}
-        self._handler_cache: Dict[str, Dict] = {}
-        self._alias_to_command: Dict[str, str] = {}
+        self._handler_cache: Dict[str, HandlerInfo] = {}
+        # 指令名和别名都直接映射到同一个 handler_info，一次查找即可
+        self._lookup: Dict[str, HandlerInfo] = {}
+        self._module_to_instance: Dict[str, Star] = {}
+        # 每次构建缓存后，实例索引未命中时最多单独刷新一次
+        self._instance_index_refreshed = False
         
         # 配置项
         self.enabled = self.config.get("enabled", True)
@@ -77,6 +168,11 @@ class LLMExecutorPlugin(Star):
         self.enable_forward = self.config.get("enable_forward", True)
         self.forward_threshold = self.config.get("forward_threshold", 1500)
         
+        # 权限检查用的集合（O(1) 查找），列表保留用于展示
+        self._whitelist_set = frozenset(self.whitelist)
+        self._blacklist_set = frozenset(self.blacklist)
+        self._admin_users_set = frozenset(self.admin_users)
+        
         logger.info(f"LLM指令执行器插件已加载 v1.1")
         logger.info(f"  - 启用状态: {self.enabled}")
         logger.info(f"  - 白名单: {self.whitelist if self.whitelist else '无限制'}")
@@ -94,39 +190,19 @@ class LLMExecutorPlugin(Star):
     def _build_handler_cache(self):
         """构建指令名到处理器的映射 - 优化版 O(N+M)"""
         self._handler_cache.clear()
-        self._alias_to_command.clear()
+        self._lookup.clear()
+        self._module_to_instance.clear()
+        self._instance_index_refreshed = False
         
-        try:
-            # 获取所有已激活的插件
-            all_stars = self.context.get_all_stars()
-            all_stars = [star for star in all_stars if star.activated]
-        except Exception as e:
-            logger.error(f"获取插件列表失败: {e}")
-            return
-        
-        if not all_stars:
-            logger.warning("没有找到任何激活的插件")
+        # === 优化关键: O(N) - 预构建 module_path -> (star, plugin_name) 的索引 ===
+        module_to_star = self._collect_stars()
+        if not module_to_star:
             return
         
-        # 跳过的插件列表
-        skip_plugins = {
-            "astrbot",
-            "astrbot_plugin_llm_executor",
-            "astrbot_plugin_command_query",
-            "astrbot-reminder"
-        }
+        # 同时建立 module_path -> 插件实例 的索引，供执行时 O(1) 查找
+        self._index_instances(module_to_star)
         
-        # === 优化关键: O(N) - 预构建 module_path -> (star, plugin_name) 的索引 ===
-        module_to_star = {}
-        for star in all_stars:
-            plugin_name = getattr(star, "name", "未知插件")
-            module_path = getattr(star, "module_path", None)
-            
-            # 跳过核心插件和自身
-            if plugin_name in skip_plugins or not module_path:
-                continue
-            
-            module_to_star[module_path] = (star, plugin_name)
+        alias_to_command: Dict[str, str] = {}
         
         # === O(M) - 只遍历一次处理器注册表，使用 O(1) 字典查找 ===
         for handler in star_handlers_registry:
@@ -164,79 +240,138 @@ class LLMExecutorPlugin(Star):
             # 如果找到了命令，添加到缓存
             if command_name:
                 # 标准化命令名（不带前缀）
-                if command_name.startswith("/"):
-                    command_name = command_name[1:]
+                command_name = _strip_slash(command_name)
                 
-                handler_info = {
-                    "command": command_name,
-                    "description": description,
-                    "plugin": plugin_name,
-                    "aliases": aliases,
-                    "is_admin": is_admin_command,
-                    "handler": handler,
-                    "module_path": handler.handler_module_path
-                }
+                handler_info = HandlerInfo(
+                    command=command_name,
+                    description=description,
+                    plugin=plugin_name,
+                    aliases=aliases,
+                    is_admin=is_admin_command,
+                    handler=handler,
+                    module_path=handler.handler_module_path
+                )
                 
                 self._handler_cache[command_name] = handler_info
                 
                 # 为别名建立索引
                 for alias in aliases:
-                    if alias.startswith("/"):
-                        alias = alias[1:]
-                    self._alias_to_command[alias] = command_name
+                    alias_to_command[_strip_slash(alias)] = command_name
+        
+        # 合并指令名和别名到同一张查找表：先放指令名，再用别名覆盖（别名优先），
+        # 别名指向同名指令最终生效的 handler_info
+        self._lookup.update(self._handler_cache)
+        for alias, command_name in alias_to_command.items():
+            self._lookup[alias] = self._handler_cache[command_name]
+
+    def _collect_stars(self) -> Optional[Dict[str, tuple]]:
+        """
+        收集可供执行的插件（已激活、非核心插件和自身、带 module_path）
+        
+        Returns:
+            module_path -> (star, plugin_name) 的字典；获取插件列表失败时返回 None
+        """
+        try:
+            # 获取所有已激活的插件
+            all_stars = self.context.get_all_stars()
+            all_stars = [star for star in all_stars if star.activated]
+        except Exception as e:
+            logger.error(f"获取插件列表失败: {e}")
+            return None
+        
+        if not all_stars:
+            logger.warning("没有找到任何激活的插件")
+            return {}
+        
+        module_to_star = {}
+        for star in all_stars:
+            plugin_name = getattr(star, "name", "未知插件")
+            module_path = getattr(star, "module_path", None)
+            
+            # 跳过核心插件和自身
+            if plugin_name in _SKIP_PLUGINS or not module_path:
+                continue
+            
+            module_to_star[module_path] = (star, plugin_name)
+        return module_to_star
+
+    def _index_instances(self, module_to_star: Dict[str, tuple]):
+        """根据 _collect_stars 的结果填充 module_path -> 插件实例 的索引"""
+        for module_path, (star, _) in module_to_star.items():
+            star_cls = getattr(star, "star_cls", None)
+            if star_cls is not None:
+                self._module_to_instance[module_path] = star_cls
 
-    def _can_execute(self, command: str, event: AstrMessageEvent) -> tuple[bool, str]:
+    def _can_execute(self, command: str, event: AstrMessageEvent
+                     ) -> tuple[bool, str, Optional[str], Optional[HandlerInfo]]:
         """
         检查是否可以执行指令
         
         Args:
-            command: 指令名（不含前缀）
+            command: 已标准化的指令名（不含前缀，由调用方去除）
             event: 消息事件
         
         Returns:
-            (是否可执行, 原因)
+            (是否可执行, 原因, 标准指令名, 处理器信息)，后两项供调用方复用，避免重复解析
         """
         # 检查插件是否启用
         if not self.enabled:
-            return False, "LLM指令执行器已禁用"
+            return False, _MSG_DISABLED, None, None
         
-        # 标准化命令名
-        if command.startswith("/"):
-            command = command[1:]
-        
-        # 解析别名
-        actual_command = self._alias_to_command.get(command, command)
-        
-        # 检查指令是否存在
-        if actual_command not in self._handler_cache:
-            return False, f"未找到指令: {command}"
-        
-        handler_info = self._handler_cache[actual_command]
+        # 检查指令是否存在（指令名和别名共用一张表）
+        handler_info = self._lookup.get(command)
+        if handler_info is None:
+            return False, f"未找到指令: {command}", None, None
+        actual_command = handler_info.command
         
         # 检查白名单
-        if self.whitelist:
-            if actual_command not in self.whitelist and command not in self.whitelist:
-                return False, f"指令 {command} 不在白名单中"
+        if self._whitelist_set:
+            if actual_command not in self._whitelist_set and command not in self._whitelist_set:
+                return False, f"指令 {command} 不在白名单中", actual_command, handler_info
         
         # 检查黑名单
-        if self.blacklist:
-            if actual_command in self.blacklist or command in self.blacklist:
-                return False, f"指令 {command} 在黑名单中"
+        if self._blacklist_set:
+            if actual_command in self._blacklist_set or command in self._blacklist_set:
+                return False, f"指令 {command} 在黑名单中", actual_command, handler_info
         
         # 检查管理员指令权限
-        if handler_info.get("is_admin", False):
+        if handler_info.is_admin:
             # 获取用户 ID
             user_id = str(event.get_sender_id())
             
             # 检查是否在管理员用户列表中
-            if user_id in self.admin_users:
-                return True, "可以执行（管理员用户）"
+            if user_id in self._admin_users_set:
+                return True, "可以执行（管理员用户）", actual_command, handler_info
             
             # 检查全局 allow_admin_commands 配置
             if not self.allow_admin_commands:
-                return False, f"指令 {command} 需要管理员权限，你不在管理员列表中"
+                return False, f"指令 {command} 需要管理员权限，你不在管理员列表中", actual_command, handler_info
         
-        return True, "可以执行"
+        return True, "可以执行", actual_command, handler_info
+
+    def _is_command_allowed_fast(self, actual_command: str, handler_info: HandlerInfo,
+                                 user_id: str) -> bool:
+        """
+        快速权限检查，用于批量遍历缓存时
+
+        调用方需保证 actual_command 已是标准指令名、handler_info 已取得、
+        且插件已启用，这里只检查白名单、黑名单和管理员权限。
+
+        Args:
+            actual_command: 标准指令名
+            handler_info: 处理器信息
+            user_id: 发送者 ID
+
+        Returns:
+            是否可执行
+        """
+        if self._whitelist_set and actual_command not in self._whitelist_set:
+            return False
+        if self._blacklist_set and actual_command in self._blacklist_set:
+            return False
+        if handler_info.is_admin:
+            return user_id in self._admin_users_set or self.allow_admin_commands
+        return True
 
     def _get_plugin_instance(self, module_path: str) -> Optional[Star]:
         """
@@ -248,15 +383,21 @@ class LLMExecutorPlugin(Star):
         Returns:
             插件实例或None
         """
-        try:
-            all_stars = self.context.get_all_stars()
-            for star in all_stars:
-                if getattr(star, "module_path", None) == module_path:
-                    return star.star_cls
-            return None
-        except Exception as e:
-            logger.error(f"获取插件实例失败: {e}")
-            return None
+        instance = self._module_to_instance.get(module_path)
+        if instance is None and not self._instance_index_refreshed:
+            # 索引可能已过期（如插件重载），只刷新实例索引一次后重试，不动指令缓存
+            self._refresh_instance_index()
+            instance = self._module_to_instance.get(module_path)
+        return instance
+
+    def _refresh_instance_index(self):
+        """重建 module_path -> 插件实例 的索引，不动指令缓存"""
+        self._instance_index_refreshed = True
+        module_to_star = self._collect_stars()
+        if module_to_star is None:
+            return
+        self._module_to_instance.clear()
+        self._index_instances(module_to_star)
 
     def _extract_content_from_result(self, result: Any) -> Dict[str, Any]:
         """
@@ -266,7 +407,7 @@ class LLMExecutorPlugin(Star):
             result: 执行结果（可能是MessageEventResult或其他类型）
         
         Returns:
-            包含 texts 和 images 的字典
+            包含 texts、images 以及文本总长度 text_len 的字典
         """
         texts = []
         images = []
@@ -275,8 +416,18 @@ class LLMExecutorPlugin(Star):
             # 处理 MessageEventResult
             if hasattr(result, 'chain') and result.chain:
                 for comp in result.chain:
+                    comp_type = type(comp)
+                    # 常见组件按类型直接处理
+                    if comp_type is Plain:
+                        text = comp.text
+                        texts.append(text if type(text) is str else str(text))
+                    elif comp_type is Image:
+                        if comp.url:
+                            images.append(str(comp.url))
+                        elif comp.file:
+                            images.append(str(comp.file))
                     # 处理纯文本
-                    if hasattr(comp, 'text') and comp.text:
+                    elif hasattr(comp, 'text') and comp.text:
                         texts.append(str(comp.text))
                     # 处理 Plain 类型
                     elif hasattr(comp, 'type') and comp.type == 'Plain':
@@ -295,9 +446,50 @@ class LLMExecutorPlugin(Star):
             elif hasattr(result, 'result_message') and result.result_message:
                 texts.append(str(result.result_message))
         except Exception as e:
-            logger.debug(f"提取内容时出错: {e}")
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(f"提取内容时出错: {e}")
         
-        return {"texts": texts, "images": images}
+        return {"texts": texts, "images": images, "text_len": sum(map(len, texts))}
+
+    def _merge_results(self, results: List[Any], platform_name: str) -> Optional[MessageEventResult]:
+        """
+        将多个结果合并为一个 MessageEventResult，各结果之间用换行分隔
+        
+        Args:
+            results: 处理器产生的结果列表
+            platform_name: 当前平台名
+        
+        Returns:
+            合并后的结果；平台不支持、存在非消息链结果、消息链含 Plain/At/Image/Face
+            以外的组件或各结果发送设置不一致时返回 None
+        """
+        if platform_name not in _MERGE_SEND_PLATFORMS:
+            return None
+        
+        first = results[0]
+        if not isinstance(first, MessageEventResult):
+            return None
+        settings = tuple(getattr(first, attr, None) for attr in _RESULT_SEND_ATTRS)
+        
+        combined_chain = []
+        for result in results:
+            if not isinstance(result, MessageEventResult) or not result.chain:
+                return None
+            if tuple(getattr(result, attr, None) for attr in _RESULT_SEND_ATTRS) != settings:
+                return None
+            for comp in result.chain:
+                if type(comp) not in _MERGEABLE_COMPONENTS:
+                    return None
+            if combined_chain:
+                combined_chain.append(Plain(text="\n"))
+            combined_chain.extend(result.chain)
+        
+        combined_result = MessageEventResult()
+        for attr in _RESULT_SEND_ATTRS:
+            if hasattr(first, attr):
+                setattr(combined_result, attr, getattr(first, attr))
+        combined_result.chain = combined_chain
+        return combined_result
 
     def _build_message_components(self, command: str, args: str = "",
                                   at_qq_list: List[str] = None,
@@ -323,24 +515,18 @@ class LLMExecutorPlugin(Star):
         # 如果有图片引用，添加 Reply 组件（包含图片）
         if reply_image_url:
             # 创建一个虚拟的 Reply 对象，包含图片
-            # Image.fromURL() 是正确的构造方式，避免缺少 file 参数
-            try:
-                img_comp = Image.fromURL(reply_image_url)
-            except (AttributeError, TypeError):
-                # 回退：直接使用 file 参数传递 URL
-                img_comp = Image(file=reply_image_url)
+            img_comp = _make_image(reply_image_url)
             reply_chain = [img_comp]
             reply_comp = Reply(id=0, sender_id=0, chain=reply_chain)
             components.append(reply_comp)
         
         # 构建消息内容
         if at_qq_list and args:
-            # 检查 args 中是否包含占位符 @0, @1, @2 等
-            has_placeholders = False
-            for i in range(len(at_qq_list)):
-                if f"@{i}" in args:
-                    has_placeholders = True
-                    break
+            # 检查 args 中是否包含有效的占位符 @0, @1, @2 等（一次正则扫描）
+            at_count = len(at_qq_list)
+            has_placeholders = any(
+                int(idx) < at_count for idx in _AT_PLACEHOLDER_RE.findall(args)
+            )
             
             if has_placeholders:
                 # 模式1: 使用占位符精确控制 @ 位置
@@ -354,9 +540,9 @@ class LLMExecutorPlugin(Star):
                 
                 for part in arg_parts:
                     # 检查是否是占位符
-                    if part.startswith("@") and len(part) > 1 and part[1:].isdigit():
+                    if part.startswith("@") and part[1:].isdigit():
                         idx = int(part[1:])
-                        if 0 <= idx < len(at_qq_list):
+                        if idx < at_count:
                             try:
                                 # 先输出累积的文本（如果有）
                                 if text_buffer:
@@ -446,59 +632,47 @@ class LLMExecutorPlugin(Star):
         reply_image_url = kwargs.get('reply_image_url', '').strip()
         as_bot = kwargs.get('as_bot', False)
         
-        # 记录执行日志
-        log_parts = [f"LLM请求执行指令: {command}"]
-        if args:
-            log_parts.append(f"参数: {args}")
-        if at_qq_list:
-            log_parts.append(f"@用户: {at_qq_list}")
-        if reply_image_url:
-            log_parts.append(f"引用图片: {reply_image_url}")
-        if as_bot:
-            log_parts.append(f"身份: Bot自己")
-        else:
-            log_parts.append(f"身份: 代理用户")
-        logger.info(" | ".join(log_parts))
+        # 记录执行日志（日志级别不输出 INFO 时跳过拼接）
+        if logger.isEnabledFor(logging.INFO):
+            log_parts = [f"LLM请求执行指令: {command}"]
+            if args:
+                log_parts.append(f"参数: {args}")
+            if at_qq_list:
+                log_parts.append(f"@用户: {at_qq_list}")
+            if reply_image_url:
+                log_parts.append(f"引用图片: {reply_image_url}")
+            if as_bot:
+                log_parts.append("身份: Bot自己")
+            else:
+                log_parts.append("身份: 代理用户")
+            logger.info(" | ".join(log_parts))
         
         # 参数检查
         if not command:
-            return json.dumps({
-                "success": False,
-                "error": "缺少必需参数: command"
-            }, ensure_ascii=False)
+            return _ERR_MISSING_COMMAND
+        
+        # 已禁用时直接返回预序列化的错误，无需构建缓存
+        if not self.enabled:
+            logger.warning(f"指令执行被拒绝: {command} - {_MSG_DISABLED}")
+            return _ERR_DISABLED
         
         # 刷新缓存（确保获取最新的处理器信息）
         if not self._handler_cache:
             self._build_handler_cache()
         
-        # 1. 检查是否可以执行
-        can_exec, reason = self._can_execute(command, event)
+        # 1. 标准化命令名（只做一次，后续日志和错误信息都使用它）
+        command = _strip_slash(command)
+        
+        # 2. 检查是否可以执行（别名解析和处理器信息由 _can_execute 一并返回）
+        can_exec, reason, actual_command, handler_info = self._can_execute(command, event)
         if not can_exec:
             logger.warning(f"指令执行被拒绝: {command} - {reason}")
-            return json.dumps({
-                "success": False,
-                "error": reason
-            }, ensure_ascii=False)
-        
-        # 2. 标准化命令名并获取处理器信息
-        if command.startswith("/"):
-            command = command[1:]
-        actual_command = self._alias_to_command.get(command, command)
-        handler_info = self._handler_cache.get(actual_command)
-        
-        if not handler_info:
-            return json.dumps({
-                "success": False,
-                "error": f"未找到指令: {command}"
-            }, ensure_ascii=False)
+            return _error_response(reason)
         
         # 3. 获取插件实例
-        plugin_instance = self._get_plugin_instance(handler_info['module_path'])
+        plugin_instance = self._get_plugin_instance(handler_info.module_path)
         if not plugin_instance:
-            return json.dumps({
-                "success": False,
-                "error": f"无法获取指令 {command} 所属插件的实例"
-            }, ensure_ascii=False)
+            return _error_response(f"无法获取指令 {command} 所属插件的实例")
         
         # 4. 执行处理器
         original_msg = event.message_str
@@ -506,17 +680,17 @@ class LLMExecutorPlugin(Star):
         original_event = None
         
         try:
-            handler: StarHandlerMetadata = handler_info['handler']
+            handler: StarHandlerMetadata = handler_info.handler
             
             # 如果as_bot=true，使用包装器替换事件对象
             if as_bot:
                 # 保存原始事件对象
                 original_event = event
-                original_sender_id = event.get_sender_id()
                 
                 # 创建包装器，覆盖 get_sender_id() 方法
                 event = BotIdentityEventWrapper(event, self.bot_user_id)
-                logger.debug(f"已创建Bot身份包装器，原始ID: {original_sender_id}, Bot ID: {self.bot_user_id}")
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug(f"已创建Bot身份包装器，原始ID: {original_event.get_sender_id()}, Bot ID: {self.bot_user_id}")
             
             # 修改 event.message_str 以包含指令和参数
             # 使用 / 作为标准前缀
@@ -528,27 +702,28 @@ class LLMExecutorPlugin(Star):
             # 如果有特殊参数，构建 message_obj
             if at_qq_list or reply_image_url:
                 try:
-                    # 构建消息组件
-                    components = self._build_message_components(
-                        actual_command,
-                        args,
-                        at_qq_list,
-                        reply_image_url
-                    )
-                    
-                    # 更新 message_obj 的 message 属性
+                    # 先确认 message_obj 可修改，再构建消息组件
                     if hasattr(event, 'message_obj') and hasattr(event.message_obj, 'message'):
+                        components = self._build_message_components(
+                            actual_command,
+                            args,
+                            at_qq_list,
+                            reply_image_url
+                        )
                         event.message_obj.message = components
-                        logger.debug(f"已构建特殊消息组件: At={len(at_qq_list) if at_qq_list else 0}, Image={bool(reply_image_url)}")
+                        if logger.isEnabledFor(logging.DEBUG):
+                            logger.debug(f"已构建特殊消息组件: At={len(at_qq_list) if at_qq_list else 0}, Image={bool(reply_image_url)}")
                     else:
                         logger.warning("无法修改 message_obj，可能不支持此操作")
                 except Exception as e:
                     logger.error(f"构建消息组件失败: {e}")
             
-            logger.debug(f"执行指令，消息设置为: {event.message_str}")
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(f"执行指令，消息设置为: {event.message_str}")
             
             # 执行并收集结果
             result_texts = []
+            result_texts_length = 0
             result_images = []
             results_to_send = []  # 收集所有结果用于合并转发判断
             
@@ -561,29 +736,32 @@ class LLMExecutorPlugin(Star):
                         # 收集内容用于返回给 LLM
                         extracted = self._extract_content_from_result(result)
                         result_texts.extend(extracted["texts"])
+                        result_texts_length += extracted["text_len"]
                         result_images.extend(extracted["images"])
             except TypeError as e:
                 # 某些处理器可能不是异步生成器
-                logger.debug(f"处理器调用方式调整: {e}")
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug(f"处理器调用方式调整: {e}")
                 result = await handler.handler(event)
                 if result is not None:
                     results_to_send.append(result)
                     # 收集内容用于返回给 LLM
                     extracted = self._extract_content_from_result(result)
                     result_texts.extend(extracted["texts"])
+                    result_texts_length += extracted["text_len"]
                     result_images.extend(extracted["images"])
             
-            # 判断是否需要使用合并转发
-            total_text_length = sum(len(text) for text in result_texts)
-            use_forward = (
-                self.enable_forward
-                and total_text_length > self.forward_threshold
-                and event.get_platform_name() == "aiocqhttp"  # 只对 QQ 平台启用
-            )
+            # 判断是否需要使用合并转发（未启用时不统计长度、不查询平台）
+            use_forward = False
+            if self.enable_forward:
+                use_forward = (
+                    result_texts_length > self.forward_threshold
+                    and event.get_platform_name() == _AIOCQHTTP
+                )
             
             if use_forward:
                 # 使用合并转发发送
-                logger.info(f"文本长度 {total_text_length} 超过阈值 {self.forward_threshold}，使用合并转发")
+                logger.info(f"文本长度 {result_texts_length} 超过阈值 {self.forward_threshold}，使用合并转发")
                 try:
                     # 将所有结果合并到一个 Node 中
                     all_components = []
@@ -597,11 +775,10 @@ class LLMExecutorPlugin(Star):
                             name="AstrBot",
                             content=all_components
                         )
-                        from astrbot.core.message.message_event_result import MessageEventResult
                         forward_result = MessageEventResult()
                         forward_result.chain = [node]
                         await event.send(forward_result)
-                        logger.debug(f"已使用合并转发发送指令结果")
+                        logger.debug("已使用合并转发发送指令结果")
                 except Exception as forward_err:
                     logger.error(f"合并转发失败，使用普通方式发送: {forward_err}")
                     # 失败则回退到普通发送
@@ -611,19 +788,32 @@ class LLMExecutorPlugin(Star):
                         except Exception as send_err:
                             logger.warning(f"发送结果失败: {send_err}")
             else:
-                # 普通发送
-                for result in results_to_send:
+                # 普通发送：条件允许时把多个结果合并为一条发送，减少发送次数
+                merged = False
+                combined_result = None
+                if len(results_to_send) > 1:
+                    combined_result = self._merge_results(results_to_send, event.get_platform_name())
+                if combined_result is not None:
                     try:
-                        await event.send(result)
-                        logger.debug(f"已发送指令结果给用户")
+                        await event.send(combined_result)
+                        merged = True
+                        logger.debug("已合并发送指令结果给用户")
                     except Exception as send_err:
-                        logger.warning(f"发送结果失败: {send_err}")
+                        logger.warning(f"合并发送失败，逐条发送: {send_err}")
+                
+                if not merged:
+                    for result in results_to_send:
+                        try:
+                            await event.send(result)
+                            logger.debug("已发送指令结果给用户")
+                        except Exception as send_err:
+                            logger.warning(f"发送结果失败: {send_err}")
             
             # 恢复原始消息和事件对象
             if as_bot and original_event is not None:
                 # 如果使用了包装器，恢复原始事件对象
                 event = original_event
-                logger.debug(f"已恢复原始事件对象")
+                logger.debug("已恢复原始事件对象")
             
             event.message_str = original_msg
             if original_message_obj is not None:
@@ -638,7 +828,11 @@ class LLMExecutorPlugin(Star):
             
             # 添加文本结果
             if result_texts:
-                response["result"] = "\n".join(result_texts)
+                # 大多数指令只返回一段文本，直接使用，无需 join
+                if len(result_texts) == 1:
+                    response["result"] = result_texts[0]
+                else:
+                    response["result"] = "\n".join(result_texts)
             
             # 添加图片URL（如果有）
             if result_images:
@@ -657,7 +851,7 @@ class LLMExecutorPlugin(Star):
                 response["executed_as"] = "user"
             
             logger.info(f"指令执行成功: {command} (身份: {'Bot' if as_bot else '用户'}), 文本: {len(result_texts)}, 图片: {len(result_images)}")
-            return json.dumps(response, ensure_ascii=False)
+            return _json_dumps(response)
             
         except Exception as e:
             logger.error(f"执行指令 {command} 时发生错误: {e}", exc_info=True)
@@ -670,11 +864,11 @@ class LLMExecutorPlugin(Star):
             except Exception:
                 pass
             
-            return json.dumps({
+            return _json_dumps({
                 "success": False,
                 "command": actual_command,
                 "error": f"执行失败: {str(e)}"
-            }, ensure_ascii=False)
+            })
 
     @filter.llm_tool(name="list_executable_commands")
     async def list_executable_commands(self, event: AstrMessageEvent, **kwargs) -> str:
@@ -696,47 +890,47 @@ class LLMExecutorPlugin(Star):
         
         logger.info(f"LLM请求列出可执行指令，分类: {category or '全部'}")
         
+        # 插件禁用时没有任何可执行指令，无需构建缓存
+        if not self.enabled:
+            return _EMPTY_COMMAND_LIST
+        
         # 刷新缓存
         if not self._handler_cache:
             self._build_handler_cache()
         
-        # 收集可执行的指令
-        executable_commands = []
+        # 循环外只计算一次
+        user_id = str(event.get_sender_id())
+        category_lower = category.lower()
+        
+        # 一次遍历直接按插件分组收集可执行的指令
+        plugins_dict = {}
+        total_count = 0
         
         for cmd_name, handler_info in self._handler_cache.items():
-            # 检查是否可执行
-            can_exec, _ = self._can_execute(cmd_name, event)
-            if not can_exec:
+            # 检查是否可执行：指令名被其他指令的别名占用时，实际执行的是别名指向的指令，
+            # 此时走完整检查，保证列出的指令与 execute_command 的判定一致
+            if self._lookup.get(cmd_name) is handler_info:
+                if not self._is_command_allowed_fast(cmd_name, handler_info, user_id):
+                    continue
+            elif not self._can_execute(cmd_name, event)[0]:
                 continue
             
             # 按分类筛选
-            if category and category.lower() not in handler_info['plugin'].lower():
+            if category and category_lower not in handler_info.plugin.lower():
                 continue
             
-            executable_commands.append({
+            plugins_dict.setdefault(handler_info.plugin, []).append({
                 "command": cmd_name,
-                "description": handler_info['description'],
-                "plugin": handler_info['plugin'],
-                "aliases": handler_info['aliases']
-            })
-        
-        # 按插件分组
-        plugins_dict = {}
-        for cmd in executable_commands:
-            plugin = cmd['plugin']
-            if plugin not in plugins_dict:
-                plugins_dict[plugin] = []
-            plugins_dict[plugin].append({
-                "command": cmd['command'],
-                "description": cmd['description'],
-                "aliases": cmd['aliases']
+                "description": handler_info.description,
+                "aliases": handler_info.aliases
             })
+            total_count += 1
         
-        return json.dumps({
+        return _json_dumps({
             "success": True,
-            "total_count": len(executable_commands),
+            "total_count": total_count,
             "plugins": plugins_dict
-        }, ensure_ascii=False, indent=2)
+        }, indent=2)
 
     @filter.command("测试bot身份")
     async def test_bot_identity(self, event: AstrMessageEvent):
@@ -803,7 +997,7 @@ Bot配置的ID: {self.bot_user_id}
         # 统计各插件的指令数
         plugin_counts = {}
         for handler_info in self._handler_cache.values():
-            plugin = handler_info['plugin']
+            plugin = handler_info.plugin
             if plugin not in plugin_counts:
                 plugin_counts[plugin] = 0
             plugin_counts[plugin] += 1